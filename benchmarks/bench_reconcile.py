@@ -0,0 +1,65 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reconcile_trips import reconcile_all
+
+# --- Batch Reconciliation Benchmark ---
+# Generates a season of random trips and times reconcile_trips.reconcile_all
+# with 1, 2, 4, ... workers up to the number of cores (or --max-workers).
+
+def write_season(trip_count, families_per_trip, expenses_per_trip, seed=1):
+    random.seed(seed)
+    trips = [f"Trip {i}" for i in range(trip_count)]
+    families = []
+    expenses = []
+    for trip in trips:
+        for f in range(families_per_trip):
+            families.append([trip, f"Family {f}", "", random.choice([0.0, 0.0, 0.0, 500.0])])
+        for _ in range(expenses_per_trip):
+            expenses.append([trip, "2024-01-01", f"Family {random.randrange(families_per_trip)}",
+                             round(random.uniform(10, 1000), 2), "Benchmark", ""])
+    pd.DataFrame({"Trip_Name": trips}).to_csv("trips.csv", index=False)
+    pd.DataFrame(families, columns=["Trip_Name", "Family", "Gmail", "Fixed_Amount"]).to_csv("families.csv", index=False)
+    pd.DataFrame(expenses, columns=["Trip_Name", "Date", "Spent_By", "Amount", "Reason", "Remarks"]).to_csv("expenses.csv", index=False)
+
+def main():
+    parser = argparse.ArgumentParser(description="Time batch reconciliation across worker counts.")
+    parser.add_argument("--trips", type=int, default=20000)
+    parser.add_argument("--families", type=int, default=6)
+    parser.add_argument("--expenses", type=int, default=40)
+    parser.add_argument("--chunk-size", type=int, default=200)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=3, help="best of this many runs per worker count")
+    args = parser.parse_args()
+
+    worker_counts = [1]
+    while worker_counts[-1] * 2 <= args.max_workers:
+        worker_counts.append(worker_counts[-1] * 2)
+
+    original_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as data_dir:
+        os.chdir(data_dir)
+        write_season(args.trips, args.families, args.expenses)
+        print(f"{args.trips} trips, {args.families} families and {args.expenses} expenses each, {os.cpu_count()} cores")
+
+        baseline = None
+        for workers in worker_counts:
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                reconcile_all("reconciliation.jsonl", workers, args.chunk_size)
+                best = min(best, time.perf_counter() - start)
+            baseline = baseline or best
+            print(f"workers={workers:<3} {best:7.3f}s  speedup {baseline / best:5.2f}x")
+        os.chdir(original_dir)
+
+if __name__ == "__main__":
+    main()
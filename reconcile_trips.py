@@ -0,0 +1,125 @@
+import argparse
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from settlement import load_data, compute_balances, settle_balances
+
+# --- Batch Reconciliation ---
+# Computes balances and payment suggestions for every trip at once, e.g. for
+# end-of-season reconciliation. Trips are split across a process pool and each
+# trip's result is written to the output file, in trips.csv order, as soon as it
+# and every trip before it are done. Duplicate trip names are reconciled once.
+
+# Set in each worker by init_worker, so tasks only need to carry a range of trips
+_trip_names = []
+_families_by_trip = {}
+_expenses_by_trip = {}
+
+def reconcile_trip(trip_name, family_rows, expense_rows):
+    detailed_report, total_expense, fixed_total, shared_expense = compute_balances(family_rows, expense_rows)
+    result = {
+        "Trip_Name": trip_name,
+        "Status": "Reconciled",
+        "Total Expense": total_expense,
+        "Fixed Expenses": fixed_total,
+        "Shared Expenses": shared_expense,
+        "Balances": [],
+        "Payments": []
+    }
+    if not family_rows or not expense_rows:
+        # Same rule as the app: nothing to settle without both families and expenses
+        result["Status"] = "Missing families or expenses"
+        return result
+
+    result["Balances"] = detailed_report
+    result["Payments"] = settle_balances([(row["Family"], row["Balance"]) for row in detailed_report])
+    return result
+
+def init_worker(trip_names, families_by_trip, expenses_by_trip):
+    # Runs once per worker, so the grouped data is sent (or forked) once rather than with every task
+    global _trip_names, _families_by_trip, _expenses_by_trip
+    _trip_names = trip_names
+    _families_by_trip = families_by_trip
+    _expenses_by_trip = expenses_by_trip
+
+def reconcile_range(start, stop):
+    # Encode in the worker so the parent only has to write the returned text
+    lines = []
+    for trip_name in _trip_names[start:stop]:
+        result = reconcile_trip(trip_name, _families_by_trip.get(trip_name, []), _expenses_by_trip.get(trip_name, []))
+        lines.append(json.dumps(result, allow_nan=False) + "\n")
+    return "".join(lines)
+
+def group_rows(df, columns):
+    # One stable sort by trip, then slice the plain row list at each trip boundary
+    df = df.dropna(subset=["Trip_Name"])
+    if df.empty:
+        return {}
+    keys = df["Trip_Name"].astype(str).to_numpy()
+    order = keys.argsort(kind="stable")
+    keys = keys[order]
+    rows = list(zip(*(df[column].to_numpy()[order].tolist() for column in columns)))
+    bounds = ((keys[1:] != keys[:-1]).nonzero()[0] + 1).tolist()
+    starts = [0] + bounds
+    stops = bounds + [len(keys)]
+    return {str(keys[start]): rows[start:stop] for start, stop in zip(starts, stops)}
+
+def reconcile_all(output_file, workers=None, chunk_size=200):
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+
+    # Reconciliation never looks at dates, so a malformed one must not abort the run
+    trips, families, expenses = load_data(parse_dates=False)
+    trip_names = trips["Trip_Name"].dropna().astype(str).drop_duplicates().tolist()
+    grouped = (
+        trip_names,
+        group_rows(families, ["Family", "Fixed_Amount"]),
+        group_rows(expenses, ["Spent_By", "Amount"])
+    )
+    ranges = [(start, min(start + chunk_size, len(trip_names))) for start in range(0, len(trip_names), chunk_size)]
+
+    with open(output_file, "w", encoding="utf-8") as out:
+        if workers == 1:
+            # A pool only adds overhead for a single worker
+            init_worker(*grouped)
+            for start, stop in ranges:
+                out.write(reconcile_range(start, stop))
+            return len(trip_names)
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=grouped) as executor:
+            # Keep a bounded number of chunks in flight and write them back in trip order
+            pending = deque()
+            for start, stop in ranges:
+                pending.append(executor.submit(reconcile_range, start, stop))
+                if len(pending) >= workers * 2:
+                    out.write(pending.popleft().result())
+                    out.flush()
+            while pending:
+                out.write(pending.popleft().result())
+                out.flush()
+    return len(trip_names)
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile balances and payment suggestions for all trips.")
+    parser.add_argument("-o", "--output", default="reconciliation.jsonl", help="JSON lines file to write per-trip results to")
+    parser.add_argument("-w", "--workers", type=positive_int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--chunk-size", type=positive_int, default=200, help="trips handed to a worker per task")
+    args = parser.parse_args()
+
+    count = reconcile_all(args.output, args.workers, args.chunk_size)
+    print(f"Reconciled {count} trips into {args.output}")
+
+if __name__ == "__main__":
+    main()
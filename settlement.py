@@ -0,0 +1,129 @@
+import math
+
+import pandas as pd
+
+# --- File Paths ---
+TRIP_FILE = "trips.csv"
+FAMILY_FILE = "families.csv"
+EXPENSE_FILE = "expenses.csv"
+
+TRIP_COLUMNS = ["Trip_Name"]
+FAMILY_COLUMNS = ["Trip_Name", "Family", "Gmail", "Fixed_Amount"]
+EXPENSE_COLUMNS = ["Trip_Name", "Date", "Spent_By", "Amount", "Reason", "Remarks"]
+BALANCE_COLUMNS = ["Family", "Category", "Total Spent", "Expected Share", "Balance"]
+
+# --- Data Loading ---
+# Kept free of Streamlit so the app and reconcile_trips.py share one loader
+
+def read_csv_or_empty(path, columns):
+    # Missing or empty files load as an empty table with the known columns
+    try:
+        return pd.read_csv(path)
+    except (FileNotFoundError, pd.errors.EmptyDataError):
+        return pd.DataFrame(columns=columns)
+
+def load_data(parse_dates=True):
+    trips = read_csv_or_empty(TRIP_FILE, TRIP_COLUMNS)
+
+    families = read_csv_or_empty(FAMILY_FILE, FAMILY_COLUMNS)
+    families["Family"] = families["Family"].fillna("")
+    families["Fixed_Amount"] = pd.to_numeric(families["Fixed_Amount"], errors='coerce').fillna(0.0)
+
+    expenses = read_csv_or_empty(EXPENSE_FILE, EXPENSE_COLUMNS)
+    expenses.columns = expenses.columns.str.strip()
+    expenses["Spent_By"] = expenses["Spent_By"].fillna("")
+    expenses["Amount"] = pd.to_numeric(expenses["Amount"], errors='coerce').fillna(0.0)
+    if parse_dates:
+        # Convert Date column to datetime
+        expenses["Date"] = pd.to_datetime(expenses["Date"]).dt.date
+
+    return trips, families, expenses
+
+# --- Balance and Settlement Helpers ---
+# The plain-list versions do the work; the DataFrame wrappers are used by the app
+
+def compute_balances(family_rows, expense_rows):
+    # family_rows: [(family, fixed_amount)], expense_rows: [(spent_by, amount)]
+    total_expense = math.fsum(amount for _, amount in expense_rows)
+
+    # Separate fixed and shared amount families
+    fixed_total = math.fsum(fixed for _, fixed in family_rows if fixed > 0)
+    shared_count = sum(1 for _, fixed in family_rows if fixed == 0)
+
+    # Calculate fixed and shared amounts
+    shared_expense = total_expense - fixed_total
+    share_per_family = (shared_expense / shared_count) if shared_count > 0 else 0
+
+    # Group spending once per family instead of filtering the expenses for each row;
+    # fsum keeps the totals independent of row order
+    amounts_by_family = {}
+    for spent_by, amount in expense_rows:
+        amounts_by_family.setdefault(spent_by, []).append(amount)
+    spent_by_family = {family: math.fsum(amounts) for family, amounts in amounts_by_family.items()}
+
+    detailed_report = []
+    for family, fixed in family_rows:
+        spent = spent_by_family.get(family, 0.0)
+        is_fixed = fixed > 0
+        expected = fixed if is_fixed else share_per_family
+        balance = spent - expected
+        category = "Fixed Amount" if is_fixed else "Shared Amount"
+        detailed_report.append({
+            "Family": family,
+            "Category": category,
+            "Total Spent": spent,
+            "Expected Share": expected,
+            "Balance": balance
+        })
+
+    return detailed_report, total_expense, fixed_total, shared_expense
+
+def calculate_balances(trip_families, trip_expenses):
+    detailed_report, total_expense, fixed_total, shared_expense = compute_balances(
+        trip_families[["Family", "Fixed_Amount"]].values.tolist(),
+        trip_expenses[["Spent_By", "Amount"]].values.tolist()
+    )
+    detailed_df = pd.DataFrame(detailed_report, columns=BALANCE_COLUMNS)
+    return detailed_df, total_expense, fixed_total, shared_expense
+
+def settle_balances(balances):
+    # balances: [(family, balance)]
+    # Separate into who needs to pay and who needs to receive
+    debtors = [(family, abs(balance)) for family, balance in balances if balance < 0]
+    creditors = [(family, balance) for family, balance in balances if balance > 0]
+
+    # Sort by amount
+    debtors.sort(key=lambda x: x[1], reverse=True)
+    creditors.sort(key=lambda x: x[1], reverse=True)
+
+    # Generate payment suggestions
+    suggestions = []
+    i, j = 0, 0
+
+    while i < len(debtors) and j < len(creditors):
+        debtor, debt = debtors[i]
+        creditor, credit = creditors[j]
+
+        if abs(debt) < 0.01 or abs(credit) < 0.01:  # Skip tiny amounts
+            if abs(debt) < 0.01: i += 1
+            if abs(credit) < 0.01: j += 1
+            continue
+
+        amount = min(debt, credit)
+        suggestions.append({
+            "From": debtor,
+            "To": creditor,
+            "Amount": round(amount, 2)
+        })
+
+        debtors[i] = (debtor, debt - amount)
+        creditors[j] = (creditor, credit - amount)
+
+        if abs(debtors[i][1]) < 0.01: i += 1
+        if abs(creditors[j][1]) < 0.01: j += 1
+
+    return suggestions
+
+def suggest_payments(detailed_df):
+    # Convert balances to a simple list of who owes what
+    return settle_balances(detailed_df[["Family", "Balance"]].values.tolist())
@@ -0,0 +1,116 @@
+import json
+
+import pandas as pd
+import pytest
+
+from reconcile_trips import reconcile_all
+from settlement import calculate_balances, suggest_payments, settle_balances
+
+
+def sample_trip():
+    families = pd.DataFrame([["Goa", "A", "", 300.0], ["Goa", "B", "", 0.0], ["Goa", "C", "", 0.0]],
+                            columns=["Trip_Name", "Family", "Gmail", "Fixed_Amount"])
+    expenses = pd.DataFrame([["Goa", "2024-01-01", "A", 500.0, "Hotel", ""],
+                             ["Goa", "2024-01-02", "B", 400.0, "Food", ""],
+                             ["Goa", "2024-01-03", "B", 100.0, "Fuel", ""]],
+                            columns=["Trip_Name", "Date", "Spent_By", "Amount", "Reason", "Remarks"])
+    return families, expenses
+
+
+def test_calculate_balances_fixed_and_shared_families():
+    families, expenses = sample_trip()
+    detailed_df, total_expense, fixed_total, shared_expense = calculate_balances(families, expenses)
+
+    # 1000 total, A pays a fixed 300, B and C split the remaining 700
+    assert (total_expense, fixed_total, shared_expense) == (1000.0, 300.0, 700.0)
+    assert detailed_df.to_dict("records") == [
+        {"Family": "A", "Category": "Fixed Amount", "Total Spent": 500.0, "Expected Share": 300.0, "Balance": 200.0},
+        {"Family": "B", "Category": "Shared Amount", "Total Spent": 500.0, "Expected Share": 350.0, "Balance": 150.0},
+        {"Family": "C", "Category": "Shared Amount", "Total Spent": 0.0, "Expected Share": 350.0, "Balance": -350.0},
+    ]
+    assert suggest_payments(detailed_df) == [
+        {"From": "C", "To": "A", "Amount": 200.0},
+        {"From": "C", "To": "B", "Amount": 150.0},
+    ]
+
+
+def test_settle_balances_skips_tiny_amounts():
+    assert settle_balances([("A", 0.005), ("B", -0.005)]) == []
+    assert settle_balances([("A", 10.004), ("B", -10.0), ("C", -0.004)]) == [{"From": "B", "To": "A", "Amount": 10.0}]
+
+
+def test_settle_balances_already_settled():
+    assert settle_balances([("A", 0.0), ("B", 0.0)]) == []
+
+
+def test_reconcile_all_with_empty_and_missing_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "families.csv").write_text("")
+    pd.DataFrame({"Trip_Name": ["Goa"]}).to_csv(tmp_path / "trips.csv", index=False)
+    output = tmp_path / "out.jsonl"
+
+    assert reconcile_all(output, workers=1) == 1
+    assert [json.loads(line) for line in output.read_text().splitlines()] == [{
+        "Trip_Name": "Goa",
+        "Status": "Missing families or expenses",
+        "Total Expense": 0.0,
+        "Fixed Expenses": 0.0,
+        "Shared Expenses": 0.0,
+        "Balances": [],
+        "Payments": []
+    }]
+
+
+def test_reconcile_all_rejects_empty_chunks(tmp_path):
+    with pytest.raises(ValueError):
+        reconcile_all(tmp_path / "out.jsonl", chunk_size=0)
+
+
+def test_reconcile_all_matches_app_settlement_and_keeps_trip_order(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    families, expenses = sample_trip()
+    trip_names = ["Goa", "Ooty", "Kochi", "Hampi", "Munnar"]
+    all_families = pd.concat([families.assign(Trip_Name=name) for name in trip_names], ignore_index=True)
+    # Vary the spending per trip so every result is different
+    all_expenses = pd.concat([expenses.assign(Trip_Name=name, Amount=expenses["Amount"] * (i + 1))
+                              for i, name in enumerate(trip_names)], ignore_index=True)
+    pd.DataFrame({"Trip_Name": trip_names}).to_csv("trips.csv", index=False)
+    all_families.to_csv("families.csv", index=False)
+    all_expenses.to_csv("expenses.csv", index=False)
+    output = tmp_path / "out.jsonl"
+
+    assert reconcile_all(output, workers=2, chunk_size=2) == len(trip_names)
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+
+    assert [line["Trip_Name"] for line in lines] == trip_names
+    for name, line in zip(trip_names, lines):
+        detailed_df, total_expense, fixed_total, shared_expense = calculate_balances(
+            all_families[all_families["Trip_Name"] == name], all_expenses[all_expenses["Trip_Name"] == name])
+        assert line == {
+            "Trip_Name": name,
+            "Status": "Reconciled",
+            "Total Expense": total_expense,
+            "Fixed Expenses": fixed_total,
+            "Shared Expenses": shared_expense,
+            "Balances": detailed_df.to_dict("records"),
+            "Payments": suggest_payments(detailed_df)
+        }
+
+
+def test_reconcile_all_writes_valid_json_for_messy_rows(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "trips.csv").write_text("Trip_Name\nGoa\nGoa\n")
+    (tmp_path / "families.csv").write_text("Trip_Name,Family,Gmail,Fixed_Amount\nGoa,,,0\nGoa,B,,0\n")
+    (tmp_path / "expenses.csv").write_text("Trip_Name,Date,Spent_By,Amount,Reason,Remarks\n"
+                                           "Goa,not a date,,100,Food,\nGoa,2024-01-01,B,50,Fuel,\n")
+    output = tmp_path / "out.jsonl"
+
+    # Duplicate trips are reconciled once and a bad date does not abort the run
+    assert reconcile_all(output, workers=1) == 1
+
+    def reject_constant(constant):
+        raise ValueError(f"invalid JSON constant {constant}")
+
+    [line] = [json.loads(text, parse_constant=reject_constant) for text in output.read_text().splitlines()]
+    assert [row["Family"] for row in line["Balances"]] == ["", "B"]
+    assert line["Payments"] == [{"From": "B", "To": "", "Amount": 25.0}]
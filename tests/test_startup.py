@@ -0,0 +1,55 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+APP_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "trip_expense_app.py")
+
+# Roughly 3x the measured cold start (~1.5s) and 5x the warm rerun (~0.08s)
+COLD_START_LIMIT = 4.5
+WARM_RERUN_LIMIT = 0.4
+
+# Runs in a fresh interpreter so cold start includes startup and every import the app pulls in
+RUN_APP = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=30).run()
+first_ok = not at.exception
+start = time.perf_counter()
+at.run()
+warm_rerun = time.perf_counter() - start
+print(json.dumps({
+    "ok": first_ok and not at.exception,
+    "warm_rerun": warm_rerun,
+    "openpyxl_loaded": "openpyxl" in sys.modules,
+}))
+"""
+
+
+def write_sample_trip(path):
+    pd.DataFrame({"Trip_Name": ["Goa"]}).to_csv(path / "trips.csv", index=False)
+    pd.DataFrame([["Goa", "A", "", 0.0], ["Goa", "B", "", 0.0]],
+                 columns=["Trip_Name", "Family", "Gmail", "Fixed_Amount"]).to_csv(path / "families.csv", index=False)
+    pd.DataFrame([["Goa", "2024-01-01", "A", 100.0, "Food", ""]],
+                 columns=["Trip_Name", "Date", "Spent_By", "Amount", "Reason", "Remarks"]).to_csv(path / "expenses.csv", index=False)
+
+
+def test_cold_start_and_warm_rerun(tmp_path):
+    write_sample_trip(tmp_path)
+
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-c", RUN_APP, APP_FILE], cwd=tmp_path,
+                               capture_output=True, text=True, timeout=60)
+    elapsed = time.perf_counter() - start
+    assert completed.returncode == 0, completed.stderr
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    cold_start = elapsed - result["warm_rerun"]
+
+    assert result["ok"]
+    assert cold_start < COLD_START_LIMIT
+    assert result["warm_rerun"] < WARM_RERUN_LIMIT
+    # Excel exports are built when a download is clicked, so a normal run must not import openpyxl
+    assert not result["openpyxl_loaded"]
@@ -3,36 +3,40 @@ import pandas as pd
 import os
 from datetime import date
 import time
-from io import BytesIO
-import base64
+from settlement import (
+    TRIP_FILE, FAMILY_FILE, EXPENSE_FILE, TRIP_COLUMNS, FAMILY_COLUMNS, EXPENSE_COLUMNS,
+    load_data, calculate_balances, suggest_payments
+)
 
 # --- Helper Functions ---
-def get_excel_download_link(df, filename, link_text):
+@st.cache_data(show_spinner=False, max_entries=16)
+def build_excel_bytes(df):
+    # pd.ExcelWriter loads openpyxl on demand, so it is only imported once an export is built
+    from io import BytesIO
     output = BytesIO()
     with pd.ExcelWriter(output, engine='openpyxl') as writer:
         df.to_excel(writer, index=False, sheet_name='Sheet1')
-    excel_data = output.getvalue()
-    b64 = base64.b64encode(excel_data).decode()
-    return f'<a href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{b64}" download="{filename}">{link_text}</a>'
+    return output.getvalue()
+
+def excel_download(df, filename, label, key):
+    # Passing a callable defers building the workbook until the button is clicked
+    st.download_button(label, lambda: build_excel_bytes(df), file_name=filename,
+                       mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                       key=f"download_{key}", on_click="ignore")
 
 def delete_record(df, index_to_delete):
     return df.drop(index_to_delete).reset_index(drop=True)
 
-# --- File Paths ---
-TRIP_FILE = "trips.csv"
-FAMILY_FILE = "families.csv"
-EXPENSE_FILE = "expenses.csv"
-
 # --- Initialize CSV files if they don't exist ---
 def initialize_csv_files():
     if not os.path.exists(TRIP_FILE) or os.path.getsize(TRIP_FILE) == 0:
-        pd.DataFrame(columns=["Trip_Name"]).to_csv(TRIP_FILE, index=False)
+        pd.DataFrame(columns=TRIP_COLUMNS).to_csv(TRIP_FILE, index=False)
     
     if not os.path.exists(FAMILY_FILE) or os.path.getsize(FAMILY_FILE) == 0:
-        pd.DataFrame(columns=["Trip_Name", "Family", "Gmail", "Fixed_Amount"]).to_csv(FAMILY_FILE, index=False)
+        pd.DataFrame(columns=FAMILY_COLUMNS).to_csv(FAMILY_FILE, index=False)
     
     if not os.path.exists(EXPENSE_FILE) or os.path.getsize(EXPENSE_FILE) == 0:
-        pd.DataFrame(columns=["Trip_Name", "Date", "Spent_By", "Amount", "Reason", "Remarks"]).to_csv(EXPENSE_FILE, index=False)
+        pd.DataFrame(columns=EXPENSE_COLUMNS).to_csv(EXPENSE_FILE, index=False)
 
 # Initialize files before setting up the page
 initialize_csv_files()
@@ -41,273 +45,13 @@ initialize_csv_files()
 st.set_page_config(page_title="Trip Expense Tracker", page_icon="🚗", layout="wide")
 
 # --- Custom CSS for Hotstar-like Theme with compact spacing ---
-st.markdown(
-    """
-    <style>
-    body {
-        background: linear-gradient(135deg, #001F3F, #003366);
-        color: white;
-    }
-    .stApp {
-        background: linear-gradient(135deg, #001F3F, #003366);
-        color: white;
-    }
-    
-    /* Header Styling */
-    h1, h2, h3, h4, h5, h6 {
-        color: #FFDD57;
-        margin: 8px 0 !important;
-        padding: 0 !important;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.3);
-    }
-    
-    /* Clean Container Styling */
-    .stTabs {
-        background: transparent;
-        border-radius: 10px;
-        padding: 10px;
-    }
-    
-    div[data-testid="stElementContainer"] {
-        background: transparent !important;
-        border: none !important;
-        box-shadow: none !important;
-    }
-    
-    /* Compact Container Spacing */
-    [data-testid="stHorizontalBlock"] {
-        padding: 0 !important;
-        margin: 0 !important;
-        gap: 0.5rem !important;
-    }
-
-    [data-testid="stVerticalBlockBorderWrapper"] {
-        padding: 0 !important;
-        margin-bottom: 0.5rem !important;
-    }
-
-    [data-testid="stColumn"] {
-        padding: 0 !important;
-        margin: 0 !important;
-    }
-    
-    /* Tab Styling */
-    .stTabs [role="tab"] {
-        color: white;
-        font-weight: bold;
-        transition: all 0.3s ease;
-        border-radius: 5px;
-        padding: 8px 16px;
-        margin: 0 4px;
-        background: rgba(255, 255, 255, 0.05);
-        border: none;
-    }
-    
-    .stTabs [role="tab"]:hover {
-        transform: translateY(-2px);
-        background: rgba(255, 255, 255, 0.1);
-    }
-    
-    .stTabs [aria-selected="true"] {
-        border-bottom: 3px solid #FF4500;
-        color: #FFDD57;
-        background: rgba(255, 255, 255, 0.1);
-    }
-    
-    /* Button Styling */
-    .stButton>button {
-        background: linear-gradient(145deg, #FF4500, #FF6B3D);
-        color: black !important;
-        font-weight: bold;
-        border-radius: 10px;
-        padding: 2px 6px !important;
-        margin: 0 !important;
-        border: none;
-        box-shadow: 0 4px 10px rgba(255, 69, 0, 0.2);
-        transition: all 0.3s ease;
-    }
-    
-    .stButton>button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 6px 15px rgba(255, 69, 0, 0.3);
-    }
-    
-    .stButton>button:active {
-        transform: translateY(1px);
-    }
-    
-    /* Input Field Styling */
-    .stTextInput>div>input, .stNumberInput>div>input, .stSelectbox>div>div>div {
-        background-color: rgba(240, 240, 240, 0.95);
-        color: black;
-        border-radius: 8px;
-        box-shadow: inset 0 2px 4px rgba(0, 0, 0, 0.1);
-    }
-    
-    /* Metric Card Styling */
-    [data-testid="stMetricValue"] {
-        font-size: 2rem !important;
-        color: #FFDD57 !important;
-        font-weight: bold;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.2);
-    }
-    
-    /* Content Container Styling */
-    div[data-testid="stVerticalBlock"] > div {
-        background: rgba(255, 255, 255, 0.05);
-        border-radius: 15px;
-        padding: 20px;
-        margin-bottom: 20px;
-        border: 1px solid rgba(255, 255, 255, 0.1);
-    }
-    
-    /* Download Button Styling */
-    a {
-        color: #FFDD57 !important;
-        text-decoration: none;
-        padding: 4px 8px !important;
-        margin: 0 0 8px 0 !important;
-        background: rgba(255, 221, 87, 0.1);
-        border-radius: 10px;
-        border: 1px solid rgba(255, 221, 87, 0.3);
-        box-shadow: 0 4px 10px rgba(0, 0, 0, 0.2);
-        transition: all 0.3s ease;
-        display: inline-block;
-    }
-    
-    a:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 6px 15px rgba(0, 0, 0, 0.25);
-        background: rgba(255, 221, 87, 0.15);
-    }
-    
-    /* Progress Bar */
-    .stProgress > div > div {
-        background: linear-gradient(90deg, #FF4500, #FF6B3D);
-        box-shadow: 0 2px 6px rgba(255, 69, 0, 0.2);
-        border-radius: 10px;
-    }
-    
-    /* DataFrames/Tables */
-    .stDataFrame {
-        background: rgba(255, 255, 255, 0.05);
-        border-radius: 15px;
-        padding: 8px !important;
-        margin: 4px 0 !important;
-        border: 1px solid rgba(255, 255, 255, 0.1);
-    }
-    
-    .dataframe {
-        color: white !important;
-        background: rgba(255, 255, 255, 0.02);
-        border-radius: 10px;
-        overflow: hidden;
-    }
-    
-    /* Alert Messages */
-    .stAlert {
-        background: rgba(255, 255, 255, 0.05);
-        border-radius: 10px;
-        border: 1px solid rgba(255, 255, 255, 0.1);
-        padding: 10px;
-    }
-
-    /* Even more compact expense rows */
-    .expense-row {
-        padding: 4px 8px !important;
-        margin: 2px 0 !important;
-        background: rgba(255, 255, 255, 0.05);
-        border-radius: 4px;
-        border: 1px solid rgba(255, 255, 255, 0.1);
-        line-height: 1.2;
-    }
-    
-    .expense-row:hover {
-        background: rgba(255, 255, 255, 0.08);
-    }
-
-    /* Remove extra padding from columns in expense view */
-    div[data-testid="column"] {
-        padding: 0 !important;
-        margin: 0 !important;
-    }
-
-    /* Adjust vertical spacing between elements */
-    .element-container, .stMarkdown {
-        margin: 0 !important;
-        padding: 0 !important;
-    }
-
-    /* Form Submit Button Text Styling */
-    button[kind="primary"] {
-        color: black !important;
-        font-weight: bold !important;
-    }
-
-    button[data-testid="stFormSubmitButton"] > div {
-        color: black !important;
-        font-weight: bold !important;
-    }
-
-    /* Ensure form submit button text is visible */
-    [data-testid="stFormSubmitButton"] p {
-        color: black !important;
-        font-weight: bold !important;
-    }
-
-    /* Override any other button text colors */
-    .stButton button p {
-        color: black !important;
-        font-weight: bold !important;
-    }
-    </style>
-    """,
-    unsafe_allow_html=True
-)
+# Served from static/ (see .streamlit/config.toml) so the browser can cache it across reruns
+st.markdown('<link rel="stylesheet" href="app/static/theme.css">', unsafe_allow_html=True)
 
 # After the imports, add:
 if 'data_loaded' not in st.session_state:
     st.session_state.data_loaded = False
 
-# --- Load or Initialize Data ---
-def load_data():
-    # Create empty DataFrames with correct columns
-    trips = pd.DataFrame(columns=["Trip_Name"])
-    families = pd.DataFrame(columns=["Trip_Name", "Family", "Gmail", "Fixed_Amount"])
-    expenses = pd.DataFrame(columns=["Trip_Name", "Date", "Spent_By", "Amount", "Reason", "Remarks"])
-    
-    # Save empty DataFrames if files don't exist
-    if not os.path.exists(TRIP_FILE):
-        trips.to_csv(TRIP_FILE, index=False)
-    else:
-        try:
-            trips = pd.read_csv(TRIP_FILE)
-        except:
-            trips.to_csv(TRIP_FILE, index=False)
-    
-    if not os.path.exists(FAMILY_FILE):
-        families.to_csv(FAMILY_FILE, index=False)
-    else:
-        try:
-            families = pd.read_csv(FAMILY_FILE)
-            families["Fixed_Amount"] = pd.to_numeric(families["Fixed_Amount"], errors='coerce').fillna(0.0)
-        except:
-            families.to_csv(FAMILY_FILE, index=False)
-    
-    if not os.path.exists(EXPENSE_FILE):
-        expenses.to_csv(EXPENSE_FILE, index=False)
-    else:
-        try:
-            expenses = pd.read_csv(EXPENSE_FILE)
-            expenses.columns = expenses.columns.str.strip()
-            expenses["Amount"] = pd.to_numeric(expenses["Amount"], errors='coerce').fillna(0.0)
-            # Convert Date column to datetime
-            expenses["Date"] = pd.to_datetime(expenses["Date"]).dt.date
-        except:
-            expenses.to_csv(EXPENSE_FILE, index=False)
-    
-    return trips, families, expenses
-
 def save_data(trips, families, expenses):
     # Convert date objects to string before saving
     expenses_to_save = expenses.copy()
@@ -428,10 +172,7 @@ with tabs[1]:
     
     if not trip_expenses.empty:
         # Add export button
-        st.markdown(get_excel_download_link(trip_expenses, 
-                                          f"{selected_trip}_expenses.xlsx",
-                                          "📥 Download Expenses Report"), 
-                   unsafe_allow_html=True)
+        excel_download(trip_expenses, f"{selected_trip}_expenses.xlsx", "📥 Download Expenses Report", "expenses")
         
         # Display expenses with compact styling
         for idx, row in trip_expenses.iterrows():
@@ -458,28 +199,11 @@ with tabs[1]:
 with tabs[2]:
     st.header(f"Summary Report - Trip: {selected_trip}")
     if not trip_families.empty and not trip_expenses.empty:
-        fixed_families = trip_families[trip_families["Fixed_Amount"] > 0]
-        shared_families = trip_families[trip_families["Fixed_Amount"] == 0]
-
-        total_expense = trip_expenses["Amount"].sum()
-        fixed_total = fixed_families["Fixed_Amount"].sum()
-        shared_expense = total_expense - fixed_total
-        share_per_family = (shared_expense / len(shared_families)) if len(shared_families) > 0 else 0
-
-        report = []
-        for _, row in trip_families.iterrows():
-            spent = trip_expenses[trip_expenses["Spent_By"] == row["Family"]]["Amount"].sum()
-            expected = row["Fixed_Amount"] if row["Fixed_Amount"] > 0 else share_per_family
-            balance = spent - expected
-            report.append([row["Family"], spent, expected, balance])
-
-        report_df = pd.DataFrame(report, columns=["Family", "Spent", "Expected", "Balance"])
+        detailed_df, _, _, _ = calculate_balances(trip_families, trip_expenses)
+        report_df = detailed_df.drop(columns="Category").rename(columns={"Total Spent": "Spent", "Expected Share": "Expected"})
         
         # Add export button for summary
-        st.markdown(get_excel_download_link(report_df, 
-                                          f"{selected_trip}_summary.xlsx",
-                                          "📥 Download Summary Report"), 
-                   unsafe_allow_html=True)
+        excel_download(report_df, f"{selected_trip}_summary.xlsx", "📥 Download Summary Report", "summary")
         
         st.dataframe(report_df)
     else:
@@ -489,36 +213,8 @@ with tabs[2]:
 with tabs[3]:
     st.header(f"Payment Suggestions - Trip: {selected_trip}")
     if not trip_families.empty and not trip_expenses.empty:
-        # Calculate total expenses and shares
-        total_expense = trip_expenses["Amount"].sum()
-        
-        # Separate fixed and shared amount families
-        fixed_families = trip_families[trip_families["Fixed_Amount"] > 0]
-        shared_families = trip_families[trip_families["Fixed_Amount"] == 0]
-        
-        # Calculate fixed and shared amounts
-        fixed_total = fixed_families["Fixed_Amount"].sum()
-        shared_expense = total_expense - fixed_total
-        share_per_family = (shared_expense / len(shared_families)) if len(shared_families) > 0 else 0
-        
-        # Create detailed report
-        detailed_report = []
-        for _, row in trip_families.iterrows():
-            spent = trip_expenses[trip_expenses["Spent_By"] == row["Family"]]["Amount"].sum()
-            is_fixed = row["Fixed_Amount"] > 0
-            expected = row["Fixed_Amount"] if is_fixed else share_per_family
-            balance = spent - expected
-            category = "Fixed Amount" if is_fixed else "Shared Amount"
-            detailed_report.append({
-                "Family": row["Family"],
-                "Category": category,
-                "Total Spent": spent,
-                "Expected Share": expected,
-                "Balance": balance
-            })
-        
-        # Convert to DataFrame and display detailed summary
-        detailed_df = pd.DataFrame(detailed_report)
+        # Calculate balances and expected shares
+        detailed_df, total_expense, fixed_total, shared_expense = calculate_balances(trip_families, trip_expenses)
         
         # Display category-wise summary
         st.subheader("Category-wise Summary")
@@ -543,50 +239,12 @@ with tabs[3]:
         # Calculate and display payment suggestions
         st.subheader("💸 Payment Suggestions")
         
-        # Convert balances to a simple list of who owes what
-        balances = detailed_df[["Family", "Balance"]].values.tolist()
-        
-        # Separate into who needs to pay and who needs to receive
-        debtors = [(family, abs(balance)) for family, balance in balances if balance < 0]
-        creditors = [(family, balance) for family, balance in balances if balance > 0]
-        
-        # Sort by amount
-        debtors.sort(key=lambda x: x[1], reverse=True)
-        creditors.sort(key=lambda x: x[1], reverse=True)
-        
-        # Generate payment suggestions
-        suggestions = []
-        i, j = 0, 0
-        
-        while i < len(debtors) and j < len(creditors):
-            debtor, debt = debtors[i]
-            creditor, credit = creditors[j]
-            
-            if abs(debt) < 0.01 or abs(credit) < 0.01:  # Skip tiny amounts
-                if abs(debt) < 0.01: i += 1
-                if abs(credit) < 0.01: j += 1
-                continue
-                
-            amount = min(debt, credit)
-            suggestions.append({
-                "From": debtor,
-                "To": creditor,
-                "Amount": round(amount, 2)
-            })
-            
-            debtors[i] = (debtor, debt - amount)
-            creditors[j] = (creditor, credit - amount)
-            
-            if abs(debtors[i][1]) < 0.01: i += 1
-            if abs(creditors[j][1]) < 0.01: j += 1
+        suggestions = suggest_payments(detailed_df)
         
         if suggestions:
             # Add export button for payment suggestions
             suggestions_df = pd.DataFrame(suggestions)
-            st.markdown(get_excel_download_link(suggestions_df, 
-                                              f"{selected_trip}_payment_suggestions.xlsx",
-                                              "📥 Download Payment Suggestions"), 
-                       unsafe_allow_html=True)
+            excel_download(suggestions_df, f"{selected_trip}_payment_suggestions.xlsx", "📥 Download Payment Suggestions", "payments")
             st.dataframe(suggestions_df)
         else:
             st.info("No payments needed - all balances are settled!")